@@ -5,6 +5,7 @@ Team CodeStorm - Memory Management Simulator
 
 import psutil
 import platform
+import time
 
 def get_memory_stats():
     """Get comprehensive memory statistics"""
@@ -41,33 +42,41 @@ CPU Usage: {psutil.cpu_percent(interval=1):.1f}%"""
         error_msg = f"Error getting system stats: {str(e)}"
         return error_msg, error_msg, error_msg
 
+def collect_processes(limit=10):
+    """Get the top processes by memory as dicts of raw values.
+       Raises if the process walk itself fails."""
+    processes = []
+
+    for proc in psutil.process_iter(['pid', 'name', 'memory_info', 'cpu_percent']):
+        try:
+            # process_iter fills in None (rather than raising) for attributes
+            # it was denied, e.g. other users' processes or zombies
+            if proc.info['memory_info'] is None:
+                continue
+            processes.append({
+                'pid': proc.info['pid'],
+                'name': proc.info['name'] or '',
+                'memory_mb': proc.info['memory_info'].rss / (1024 * 1024),  # Convert to MB
+                'cpu_percent': proc.info['cpu_percent'] or 0.0
+            })
+
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            # Skip processes that can't be accessed
+            continue
+
+    # Sort by memory usage (descending) and return top processes
+    processes.sort(key=lambda p: p['memory_mb'], reverse=True)
+    return processes[:limit]
+
 def get_process_list(limit=10):
     """Get list of running processes with memory and CPU usage"""
     try:
-        processes = []
-
-        for proc in psutil.process_iter(['pid', 'name', 'memory_info', 'cpu_percent']):
-            try:
-                # Get process info
-                pid = proc.info['pid']
-                name = proc.info['name']
-                memory_mb = proc.info['memory_info'].rss / (1024 * 1024)  # Convert to MB
-                cpu_percent = proc.info['cpu_percent'] or 0.0
-
-                processes.append([
-                    str(pid),
-                    name[:25],  # Truncate long names
-                    f"{memory_mb:.1f}",
-                    f"{cpu_percent:.1f}"
-                ])
-
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                # Skip processes that can't be accessed
-                continue
-
-        # Sort by memory usage (descending) and return top processes
-        processes.sort(key=lambda x: float(x[2]), reverse=True)
-        return processes[:limit]
+        return [[
+            str(p['pid']),
+            p['name'][:25],  # Truncate long names
+            f"{p['memory_mb']:.1f}",
+            f"{p['cpu_percent']:.1f}"
+        ] for p in collect_processes(limit)]
 
     except Exception as e:
         return [["Error", str(e)[:30], "0.0", "0.0"]]
@@ -116,6 +125,31 @@ def get_disk_usage():
     except:
         return {'total': 500, 'used': 200, 'free': 300, 'percent': 40}
 
+def get_snapshot(process_limit=10):
+    """Get a structured snapshot of memory, swap, CPU and top processes.
+       Uses non-blocking cpu_percent, so it should be called periodically.
+       Errors propagate so callers never mistake a failed walk for an idle host."""
+    vm = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    processes = collect_processes(process_limit)
+    return {
+        'timestamp': time.time(),
+        'memory': {
+            'total': vm.total,
+            'used': vm.used,
+            'available': vm.available,
+            'percent': vm.percent
+        },
+        'swap': {
+            'total': swap.total,
+            'used': swap.used,
+            'free': swap.free,
+            'percent': swap.percent
+        },
+        'cpu_percent': psutil.cpu_percent(interval=None),
+        'processes': processes
+    }
+
 def format_bytes(bytes_value):
     """Format bytes into human readable format"""
     for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -0,0 +1,285 @@
+"""
+Asyncio monitoring service exporting metrics over a local endpoint
+Team CodeStorm - Memory Management Simulator
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+from monitor import get_snapshot
+
+CONTENT_JSON = "application/json"
+CONTENT_PROMETHEUS = "text/plain; version=0.0.4"
+
+
+def format_prometheus(snapshot):
+    """Render a snapshot in Prometheus text exposition format"""
+    lines = []
+
+    def gauge(name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+
+    mem, swap = snapshot['memory'], snapshot['swap']
+    gauge("memsim_memory_bytes", "Virtual memory in bytes.",
+          [(f'{{state="{key}"}}', mem[key]) for key in ('total', 'used', 'available')])
+    gauge("memsim_memory_percent", "Virtual memory usage percent.", [("", mem['percent'])])
+    gauge("memsim_swap_bytes", "Swap memory in bytes.",
+          [(f'{{state="{key}"}}', swap[key]) for key in ('total', 'used', 'free')])
+    gauge("memsim_swap_percent", "Swap usage percent.", [("", swap['percent'])])
+    gauge("memsim_cpu_percent", "System-wide CPU usage percent.", [("", snapshot['cpu_percent'])])
+
+    def proc_labels(p):
+        name = p['name'].replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return f'{{pid="{p["pid"]}",name="{name}"}}'
+
+    gauge("memsim_process_memory_megabytes", "Resident memory of top processes in MB.",
+          [(proc_labels(p), p['memory_mb']) for p in snapshot['processes']])
+    gauge("memsim_process_cpu_percent", "CPU usage of top processes.",
+          [(proc_labels(p), p['cpu_percent']) for p in snapshot['processes']])
+    gauge("memsim_snapshot_timestamp_seconds", "Unix time the snapshot was taken.",
+          [("", snapshot['timestamp'])])
+    return "\n".join(lines) + "\n"
+
+
+class MonitorService:
+    """Samples monitor.get_snapshot() on a schedule and serves it over HTTP.
+
+    Only one sample is ever in flight: concurrent requests await the same
+    future, and a finished sample is reused for `interval` seconds, so any
+    number of scrapers costs at most one process walk per interval. Rendered
+    responses are cached against the snapshot they were built from. A failed
+    sample also counts as a sample: until the next interval the last good
+    snapshot keeps being served, or the error is re-raised if there is none."""
+
+    def __init__(self, interval=2.0, history_size=60, process_limit=10, sampler=get_snapshot,
+                 read_timeout=5.0):
+        self.interval = interval
+        self.read_timeout = read_timeout
+        self.process_limit = process_limit
+        self.sampler = sampler
+        self.history = deque(maxlen=history_size)
+        self.latest = None
+        self._error = None
+        self._sampled_at = None
+        self._inflight = None
+        self._responses = {}
+        self._scheduler = None
+
+    async def get_snapshot(self):
+        """Return the current snapshot, sampling only if the cached one expired."""
+        loop = asyncio.get_running_loop()
+        if self._sampled_at is not None and loop.time() - self._sampled_at < self.interval:
+            if self.latest is None and self._error is not None:
+                raise self._error
+            return self.latest
+        return await self._sample_once()
+
+    async def _sample_once(self):
+        """Start a sample unless one is already running, and wait for it."""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._sample())
+        # shield so a cancelled client doesn't cancel the shared sample
+        return await asyncio.shield(self._inflight)
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        try:
+            # psutil calls block, so run them off the event loop
+            snapshot = await loop.run_in_executor(None, self.sampler, self.process_limit)
+        except Exception as e:
+            print(f"Sampling failed: {e}")
+            self._error = e
+            self._sampled_at = loop.time()
+            if self.latest is None:
+                raise
+            return self.latest
+        else:
+            self.latest = snapshot
+            self._error = None
+            self._sampled_at = loop.time()
+            self.history.append(snapshot)
+            self._responses.clear()
+            return snapshot
+        finally:
+            self._inflight = None
+
+    async def _schedule(self):
+        # Sleep until fixed deadlines so sampling time doesn't add drift, and
+        # bypass the cache check so an early wake-up never skips a cycle
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while True:
+            try:
+                await self._sample_once()
+            except Exception:
+                # Already reported by _sample
+                pass
+            next_at += self.interval
+            await asyncio.sleep(max(0, next_at - loop.time()))
+
+    async def render(self, path):
+        """Return (status, content_type, body) for a request path."""
+        routes = {
+            '/snapshot': (CONTENT_JSON, lambda: json.dumps(self.latest)),
+            '/history': (CONTENT_JSON, lambda: json.dumps(list(self.history))),
+            '/metrics': (CONTENT_PROMETHEUS, lambda: format_prometheus(self.latest)),
+        }
+        if path not in routes:
+            return 404, "text/plain", b"Not Found\n"
+        await self.get_snapshot()
+        cached = self._responses.get(path)
+        if cached is None:
+            content_type, build = routes[path]
+            cached = (content_type, build().encode("utf-8"))
+            self._responses[path] = cached
+        return (200,) + cached
+
+    async def _read_request_line(self, reader):
+        """Read the request line and drain headers; None if the line is empty."""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        # The body of a GET is ignored
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        return request_line
+
+    async def handle_client(self, reader, writer):
+        try:
+            try:
+                request_line = await asyncio.wait_for(self._read_request_line(reader),
+                                                      self.read_timeout)
+            except asyncio.TimeoutError:
+                # Idle or slow client: drop it without a response
+                return
+            except ValueError:
+                # Line longer than the stream limit
+                request_line = None
+            parts = request_line.decode("latin-1").split() if request_line else []
+            if len(parts) < 2:
+                status, content_type, body = 400, "text/plain", b"Bad Request\n"
+            elif parts[0] != "GET":
+                status, content_type, body = 405, "text/plain", b"Method Not Allowed\n"
+            else:
+                try:
+                    status, content_type, body = await self.render(parts[1].split("?", 1)[0])
+                except Exception as e:
+                    status, content_type, body = 500, "text/plain", f"Error: {e}\n".encode("utf-8")
+            reasons = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                       405: "Method Not Allowed", 500: "Internal Server Error"}
+            header = (f"HTTP/1.1 {status} {reasons[status]}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Connection: close\r\n\r\n")
+            writer.write(header.encode("latin-1") + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host="127.0.0.1", port=9100, unix_path=None):
+        """Start the sampler and serve until cancelled. Binds a Unix socket
+           instead of TCP when unix_path is given."""
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        # Only start sampling once the socket is bound, so a failed bind
+        # leaves no task behind
+        self._scheduler = asyncio.ensure_future(self._schedule())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._scheduler.cancel()
+
+
+# Test function
+def test_monitor_service(clients=20):
+    """Check that concurrent requests share one sample and reuse cached responses"""
+    calls = []
+
+    def stub_sampler(limit):
+        calls.append(limit)
+        time.sleep(0.1)
+        return {'timestamp': time.time(),
+                'memory': {'total': 8, 'used': 4, 'available': 4, 'percent': 50.0},
+                'swap': {'total': 2, 'used': 0, 'free': 2, 'percent': 0.0},
+                'cpu_percent': 12.5,
+                'processes': [{'pid': 1, 'name': 'a"b\\c\nd', 'memory_mb': 1.5, 'cpu_percent': 0.0}]}
+
+    async def run():
+        service = MonitorService(interval=60, sampler=stub_sampler)
+        paths = ['/snapshot', '/history', '/metrics'] * clients
+        results = await asyncio.gather(*[service.render(path) for path in paths])
+        assert len(calls) == 1, f"expected 1 sample, got {len(calls)}"
+        assert all(status == 200 for status, _, _ in results)
+        # Same cached body object is handed to every request for a path
+        assert results[0][2] is results[3][2]
+        assert (await service.render('/missing'))[0] == 404
+
+        # A failed sample is cached too: sequential requests within the
+        # interval cost one attempt and keep getting the last good snapshot
+        def failing_sampler(limit):
+            calls.append(limit)
+            raise RuntimeError("walk failed")
+        service.sampler = failing_sampler
+        service._sampled_at -= service.interval
+        for _ in range(5):
+            status, _, body = await service.render('/snapshot')
+            assert status == 200 and body == results[0][2]
+        assert len(calls) == 2, f"expected 2 samples, got {len(calls)}"
+
+        # With no good snapshot yet the error is cached and re-raised
+        empty = MonitorService(interval=60, sampler=failing_sampler)
+        for _ in range(3):
+            try:
+                await empty.render('/metrics')
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("expected the sampling error")
+        assert len(calls) == 3, f"expected 3 samples, got {len(calls)}"
+        return results[2][2].decode("utf-8")
+
+    metrics = asyncio.run(run())
+    assert 'name="a\\"b\\\\c\\nd"' in metrics
+    print("=== Memory Management Simulator - Monitor Service Test ===")
+    print(f"{clients * 3} concurrent requests served from 1 sample; failed samples cached")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve memory monitor metrics (JSON + Prometheus)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--unix", dest="unix_path", help="serve on a Unix socket path instead of TCP")
+    parser.add_argument("--interval", type=float, default=2.0, help="sample interval in seconds")
+    parser.add_argument("--history", type=int, default=60, help="number of snapshots to keep")
+    parser.add_argument("--test", action="store_true", help="run the self-check and exit")
+    args = parser.parse_args()
+
+    if args.test:
+        test_monitor_service()
+        return
+
+    service = MonitorService(interval=args.interval, history_size=args.history)
+    where = args.unix_path or f"http://{args.host}:{args.port}"
+    print(f"Serving /snapshot, /history and /metrics on {where}")
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix_path))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()